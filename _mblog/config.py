@@ -6,6 +6,32 @@ import json
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
+
+
+def _load_json(path: Path) -> Any:
+    """
+    读取并解析 JSON 文件
+    
+    安装了 orjson 时直接解析字节，跳过文本解码层
+    
+    Args:
+        path: JSON 文件路径
+        
+    Returns:
+        解析后的数据
+        
+    Raises:
+        json.JSONDecodeError: JSON 格式错误（orjson 的异常同为其子类）
+    """
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 
 class ConfigError(Exception):
     """配置文件错误"""
@@ -24,6 +50,7 @@ class Config:
         """
         self.config_path = Path(config_path)
         self._config_data: Dict[str, Any] = {}
+        self._flat_cache: Dict[str, Any] = {}
         self._loaded = False
     
     def load(self) -> Dict[str, Any]:
@@ -40,8 +67,7 @@ class Config:
             raise ConfigError(f"配置文件不存在: {self.config_path}")
         
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                self._config_data = json.load(f)
+            self._config_data = _load_json(self.config_path)
         except json.JSONDecodeError as e:
             raise ConfigError(f"配置文件格式错误: {e}")
         except Exception as e:
@@ -51,6 +77,10 @@ class Config:
         if not self.validate():
             raise ConfigError("配置文件验证失败")
         
+        # 构建扁平化键缓存
+        self._flat_cache = {}
+        self._flatten('', self._config_data)
+        
         self._loaded = True
         return self._config_data
     
@@ -100,6 +130,10 @@ class Config:
         if not self._loaded:
             raise ConfigError("配置尚未加载，请先调用 load() 方法")
         
+        # 优先从扁平化缓存中查找
+        if key in self._flat_cache:
+            return self._flat_cache[key]
+        
         # 支持嵌套键访问
         keys = key.split('.')
         value = self._config_data
@@ -112,6 +146,27 @@ class Config:
         
         return value
     
+    def _flatten(self, prefix: str, data: Dict[str, Any]) -> None:
+        """
+        递归展开嵌套配置，写入扁平化键缓存
+        
+        例如 {'build': {'md_dir': 'md'}} 会生成 'build' 和 'build.md_dir' 两个键
+        
+        Args:
+            prefix: 当前层级的键前缀
+            data: 当前层级的配置字典
+        """
+        for k, value in data.items():
+            # 键名本身包含点号时无法通过点号路径访问，不放入缓存
+            if not isinstance(k, str) or '.' in k:
+                continue
+            
+            flat_key = f'{prefix}{k}'
+            self._flat_cache[flat_key] = value
+            
+            if isinstance(value, dict):
+                self._flatten(f'{flat_key}.', value)
+    
     def get_theme_config(self) -> Dict[str, Any]:
         """
         获取主题相关配置
@@ -2,9 +2,22 @@
 静态文件生成模块
 负责生成最终的静态 HTML 文件和复制静态资源
 """
+import errno
+import multiprocessing
+import os
+import re
 import shutil
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Set, TextIO, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
 
 from .config import Config
 from .theme import Theme
@@ -12,11 +25,129 @@ from .renderer import Renderer
 from .markdown_processor import Post
 
 
+# 文章数少于此值时串行渲染，进程池的启动开销得不偿失
+PARALLEL_MIN_POSTS = 32
+
+# 流式写入输出文件时使用的缓冲区大小
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# 写入输出文件的打开标志（Windows 上使用二进制模式，避免换行符转换）
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+
+# 文件名清理：移除不安全字符、将空白和下划线替换为连字符
+_UNSAFE_CHARS = re.compile(r'[^\w\s\u4e00-\u9fff-]')
+_WS_RUN = re.compile(r'[\s_]+')
+
+# os.copy_file_range 返回这些错误时说明当前文件系统/内核不支持，回退到 shutil.copy2
+_COPY_FALLBACK_ERRNOS = {
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM, errno.ETXTBSY
+}
+
+# 渲染任务: (页面类型, 参数)，页面类型为 'index' / 'post' / 'tag'
+RenderTask = Tuple[str, Any]
+
+# 子进程中的渲染上下文，由 _init_render_worker 初始化
+_worker_renderer: Optional[Renderer] = None
+_worker_posts: List[Post] = []
+_worker_tags_map: Dict[str, List[Post]] = {}
+
+
 class GenerationError(Exception):
     """生成错误"""
     pass
 
 
+def _fast_copy(src: str, dst: str) -> str:
+    """
+    复制单个文件及其元数据（可作为 shutil.copytree 的 copy_function）
+    
+    Linux 上优先使用 os.copy_file_range 在内核中完成复制，数据不经过用户态，
+    在支持的文件系统上还可以直接共享数据块；不支持或未复制完整时回退到 shutil.copy2
+    （Linux 上使用 os.sendfile，Windows 上使用系统复制接口）
+    
+    Args:
+        src: 源文件路径
+        dst: 目标文件路径
+        
+    Returns:
+        目标文件路径
+    """
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        # 部分文件系统不报错而是直接返回 0，此时改用 shutil.copy2 重新复制
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                shutil.copystat(src, dst)
+                return dst
+        except OSError as e:
+            if e.errno not in _COPY_FALLBACK_ERRNOS:
+                raise
+    
+    return shutil.copy2(src, dst)
+
+
+def _init_render_worker(config_path: str, theme_dir: str, posts: List[Post]) -> None:
+    """
+    进程池 worker 初始化函数
+    
+    Jinja2 环境无法序列化，因此在每个子进程中根据配置和主题路径重建渲染器，
+    文章列表也只在初始化时传递一次，之后的任务只传递页面类型和索引
+    
+    Args:
+        config_path: 配置文件路径
+        theme_dir: 主题目录路径
+        posts: 文章列表
+    """
+    global _worker_renderer, _worker_posts, _worker_tags_map
+    
+    config = Config(config_path)
+    config.load()
+    theme = Theme(theme_dir)
+    theme.load()
+    
+    _worker_renderer = Renderer(theme, config)
+    _worker_posts = posts
+    _worker_tags_map = _worker_renderer.get_all_tags(posts)
+
+
+def _render_task(renderer: Renderer, posts: List[Post],
+                 tags_map: Optional[Dict[str, List[Post]]], task: RenderTask) -> str:
+    """
+    渲染单个页面
+    
+    Args:
+        renderer: 渲染器实例
+        posts: 文章列表
+        tags_map: 标签到文章列表的映射（仅标签页需要）
+        task: 渲染任务
+        
+    Returns:
+        渲染后的 HTML 字符串
+    """
+    kind, arg = task
+    
+    if kind == 'post':
+        return renderer.render_post(posts[arg])
+    if kind == 'tag':
+        return renderer.render_tag_page(arg, tags_map[arg])
+    if kind == 'index':
+        page, posts_per_page = arg
+        return renderer.render_index(posts, page=page, posts_per_page=posts_per_page)
+    
+    raise GenerationError(f"未知的渲染任务类型: {kind}")
+
+
+def _render_task_in_worker(task: RenderTask) -> str:
+    """在进程池 worker 中渲染单个页面"""
+    return _render_task(_worker_renderer, _worker_posts, _worker_tags_map, task)
+
+
 class StaticGenerator:
     """静态文件生成器"""
     
@@ -38,6 +169,43 @@ class StaticGenerator:
         # 获取输出目录
         output_dir = self.config.get('build.output_dir', 'public')
         self.output_dir = Path(output_dir)
+        
+        # 构建开关和参数在整个构建过程中不变，构造时一次性解析
+        self._flags = types.SimpleNamespace(
+            rss=bool(self.config.get('build.generate_rss', True)),
+            sitemap=bool(self.config.get('build.generate_sitemap', True)),
+            workers=self.config.get('build.workers'),
+            posts_per_page=self.config.get('theme_config.posts_per_page'),
+            # 假设 md_dir 是 'md'
+            md_dir=Path(self.config.get('build.md_dir', 'md')).resolve()
+        )
+        
+        # 站点配置和 URL 前缀在整个构建过程中不变，只计算一次
+        self._site_config = self.config.get_site_config()
+        self._site_url = self._site_config.get('url', 'https://example.com').rstrip('/')
+        
+        # 获取 base_path（用于子目录部署）
+        base_path = self._site_config.get('base_path', '').strip()
+        if base_path and not base_path.startswith('/'):
+            base_path = '/' + base_path
+        if base_path.endswith('/'):
+            base_path = base_path[:-1]
+        self._base_path = base_path
+        
+        # 本次构建中已创建的目录，避免重复的 mkdir 系统调用
+        self._created_dirs: Set[Path] = set()
+        
+        # 后台删除旧输出目录的线程，及正在删除的旧目录
+        self._cleanup_thread: Optional[threading.Thread] = None
+        self._cleanup_dir: Optional[Path] = None
+        
+        # 页面渲染进程池（仅在 _generate_pages 期间存在）
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # 并行渲染可用的 worker 数（build.workers 或 CPU 核数），由 _create_executor 计算
+        self._workers = 1
+        
+        # 标签到文章列表的映射（延迟计算，标签页和 Sitemap 共用）
+        self._tags_map_cache: Optional[Dict[str, List[Post]]] = None
     
     def generate(self) -> bool:
         """
@@ -66,19 +234,42 @@ class StaticGenerator:
             
         except Exception as e:
             raise GenerationError(f"生成失败: {e}")
+        finally:
+            # 等待旧输出目录删除完成
+            if self._cleanup_thread is not None:
+                self._cleanup_thread.join()
+                self._cleanup_thread = None
+                if self._cleanup_dir.exists():
+                    print(f"警告: 无法完全删除旧输出目录 {self._cleanup_dir}，请手动删除")
+                self._cleanup_dir = None
     
     def _prepare_output_dir(self) -> None:
         """
         准备输出目录
         
-        如果目录存在，清空内容；如果不存在，创建目录
+        如果目录存在，先将其重命名，再在后台线程中删除，
+        删除旧文件与后续的生成过程同时进行；如果不存在，直接创建目录
         """
         if self.output_dir.exists():
-            # 清空现有内容
-            shutil.rmtree(self.output_dir)
+            old_dir = self.output_dir.with_name(f'{self.output_dir.name}.old.{os.urandom(4).hex()}')
+            try:
+                os.rename(self.output_dir, old_dir)
+            except OSError:
+                # 无法重命名（如输出目录是挂载点），直接同步删除
+                shutil.rmtree(self.output_dir)
+            else:
+                self._cleanup_dir = old_dir
+                self._cleanup_thread = threading.Thread(
+                    target=shutil.rmtree,
+                    args=(old_dir,),
+                    kwargs={'ignore_errors': True},
+                    name='mblog-cleanup'
+                )
+                self._cleanup_thread.start()
         
         # 创建输出目录
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._created_dirs.clear()
+        self._ensure_dir(self.output_dir)
         
         print(f"✓ 输出目录已准备: {self.output_dir}")
     
@@ -96,7 +287,7 @@ class StaticGenerator:
             static_dest = self.output_dir / 'static'
             
             try:
-                shutil.copytree(static_src, static_dest)
+                shutil.copytree(static_src, static_dest, copy_function=_fast_copy)
                 print(f"✓ 静态资源已复制: {static_src} -> {static_dest}")
             except Exception as e:
                 raise GenerationError(f"复制静态资源失败: {e}")
@@ -119,24 +310,30 @@ class StaticGenerator:
         """
         print("开始生成页面...")
         
-        # 生成首页和分页
-        self._generate_index_pages()
-        
-        # 生成文章详情页
-        self._generate_post_pages()
-        
-        # 生成标签相关页面
-        self._generate_tag_pages()
+        self._executor = self._create_executor()
+        try:
+            # 生成首页和分页
+            self._generate_index_pages()
+            
+            # 生成文章详情页
+            self._generate_post_pages()
+            
+            # 生成标签相关页面
+            self._generate_tag_pages()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
         
         # 生成归档页（可选）
         self._generate_archive_page()
         
         # 生成 RSS 订阅（可选）
-        if self.config.get('build.generate_rss', True):
+        if self._flags.rss:
             self._generate_rss()
         
         # 生成 Sitemap（可选）
-        if self.config.get('build.generate_sitemap', True):
+        if self._flags.sitemap:
             self._generate_sitemap()
         
         # 生成搜索索引
@@ -144,6 +341,63 @@ class StaticGenerator:
         
         print(f"✓ 所有页面生成完成")
     
+    def _create_executor(self) -> Optional[ProcessPoolExecutor]:
+        """
+        创建页面渲染进程池
+        
+        进程数由 build.workers 配置（默认为 CPU 核数），同时记录在 self._workers 中。
+        进程数为 1 或文章数较少时返回 None，使用串行渲染
+        
+        Returns:
+            进程池实例，或 None
+        """
+        workers = self._flags.workers or os.cpu_count() or 1
+        self._workers = workers
+        
+        if workers <= 1 or len(self.posts) < PARALLEL_MIN_POSTS:
+            return None
+        
+        print(f"  使用 {workers} 个进程并行渲染")
+        
+        # 此时后台线程可能仍在删除旧输出目录，直接 fork 多线程进程可能使子进程死锁；
+        # worker 的状态全部由初始化函数按路径重建，不依赖 fork 继承
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context('forkserver')
+        else:
+            mp_context = None
+        
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=_init_render_worker,
+            initargs=(
+                str(self.config.config_path.resolve()),
+                str(self.theme.theme_dir.resolve()),
+                self.posts
+            )
+        )
+    
+    def _render_pages(self, tasks: List[RenderTask],
+                      tags_map: Optional[Dict[str, List[Post]]] = None) -> Iterable[str]:
+        """
+        渲染一批页面
+        
+        存在进程池时分发到子进程并行渲染，否则在当前进程串行渲染。
+        返回结果的顺序与 tasks 一致
+        
+        Args:
+            tasks: 渲染任务列表
+            tags_map: 标签到文章列表的映射（仅标签页需要）
+            
+        Returns:
+            渲染后的 HTML 字符串迭代器
+        """
+        if self._executor is None:
+            return (_render_task(self.renderer, self.posts, tags_map, task) for task in tasks)
+        
+        chunksize = max(1, len(tasks) // (4 * self._workers))
+        return self._executor.map(_render_task_in_worker, tasks, chunksize=chunksize)
+    
     def _generate_index_pages(self) -> None:
         """
         生成首页和分页
@@ -151,7 +405,7 @@ class StaticGenerator:
         根据配置决定是否启用分页
         """
         # 获取分页配置
-        posts_per_page = self.config.get('theme_config.posts_per_page')
+        posts_per_page = self._flags.posts_per_page
         
         if posts_per_page is None or posts_per_page <= 0:
             # 不分页，生成单个首页
@@ -164,20 +418,16 @@ class StaticGenerator:
             total_posts = len(self.posts)
             total_pages = (total_posts + posts_per_page - 1) // posts_per_page
             
-            for page in range(1, total_pages + 1):
-                html = self.renderer.render_index(
-                    self.posts, 
-                    page=page, 
-                    posts_per_page=posts_per_page
-                )
-                
+            tasks = [('index', (page, posts_per_page)) for page in range(1, total_pages + 1)]
+            
+            for page, html in enumerate(self._render_pages(tasks), start=1):
                 if page == 1:
                     # 第一页作为首页
                     index_path = self.output_dir / 'index.html'
                 else:
                     # 其他页面放在 page 目录下
                     page_dir = self.output_dir / 'page'
-                    page_dir.mkdir(exist_ok=True)
+                    self._ensure_dir(page_dir)
                     index_path = page_dir / f'{page}.html'
                 
                 self._write_file(index_path, html)
@@ -192,16 +442,44 @@ class StaticGenerator:
         使用 relative_path 来确定输出路径
         """
         posts_dir = self.output_dir / 'posts'
-        posts_dir.mkdir(exist_ok=True)
-        
-        for post in self.posts:
-            html = self.renderer.render_post(post)
-            # 使用 relative_path 保留目录结构
-            post_path = posts_dir / f'{post.relative_path}.html'
-            self._write_file(post_path, html)
+        self._ensure_dir(posts_dir)
+        
+        if self._executor is not None:
+            tasks = [('post', i) for i in range(len(self.posts))]
+            for post, html in zip(self.posts, self._render_pages(tasks)):
+                # 使用 relative_path 保留目录结构
+                post_path = posts_dir / f'{post.relative_path}.html'
+                self._write_file(post_path, html)
+        elif self._workers > 1 and any(post.encrypted and post.password for post in self.posts):
+            # 未启用进程池时，仅在有加密文章时使用线程池：密钥派生和加密会释放 GIL，
+            # 普通文章的模板渲染持有 GIL，多线程只会增加开销。每个任务写入自己的文件
+            with ThreadPoolExecutor(max_workers=self._workers) as executor:
+                list(executor.map(lambda post: self._stream_post_page(posts_dir, post), self.posts))
+        else:
+            for post in self.posts:
+                self._stream_post_page(posts_dir, post)
         
         print(f"  ✓ 文章详情页: {len(self.posts)} 篇")
     
+    def _stream_post_page(self, posts_dir: Path, post: Post) -> None:
+        """
+        渲染文章详情页并直接流式写入文件，无需先拼接完整 HTML
+        
+        Args:
+            posts_dir: 文章页输出目录
+            post: 文章对象
+            
+        Raises:
+            GenerationError: 写入失败
+        """
+        # 使用 relative_path 保留目录结构
+        post_path = posts_dir / f'{post.relative_path}.html'
+        try:
+            with self._open_output(post_path) as f:
+                self.renderer.render_post_to(post, f)
+        except OSError as e:
+            raise GenerationError(f"写入文件失败 {post_path}: {e}")
+    
     def _generate_tag_pages(self) -> None:
         """
         生成标签相关页面
@@ -211,14 +489,14 @@ class StaticGenerator:
         - 每个标签的文章列表页
         """
         # 获取所有标签
-        tags_map = self.renderer.get_all_tags(self.posts)
+        tags_map = self._get_tags_map()
         
         if not tags_map:
             print("  没有标签，跳过标签页生成")
             return
         
         tags_dir = self.output_dir / 'tags'
-        tags_dir.mkdir(exist_ok=True)
+        self._ensure_dir(tags_dir)
         
         # 生成标签索引页
         try:
@@ -230,11 +508,12 @@ class StaticGenerator:
             print(f"  跳过标签索引页: {e}")
         
         # 生成每个标签的页面
-        for tag, posts in tags_map.items():
+        tasks = [('tag', tag) for tag in tags_map]
+        
+        for tag, html in zip(tags_map, self._render_pages(tasks, tags_map)):
             # 标签名转换为文件名（处理特殊字符）
             tag_filename = self._sanitize_filename(tag)
             
-            html = self.renderer.render_tag_page(tag, posts)
             tag_path = tags_dir / f'{tag_filename}.html'
             self._write_file(tag_path, html)
         
@@ -268,64 +547,147 @@ class StaticGenerator:
         """
         try:
             # 确保父目录存在
-            filepath.parent.mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(filepath.parent)
             
-            # 写入文件
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # 一次编码后直接写入文件描述符，绕过文本 I/O 包装层
+            data = memoryview(content.encode('utf-8'))
+            fd = os.open(filepath, _WRITE_FLAGS, 0o666)
+            try:
+                while data:
+                    written = os.write(fd, data)
+                    data = data[written:]
+            finally:
+                os.close(fd)
         except Exception as e:
             raise GenerationError(f"写入文件失败 {filepath}: {e}")
     
+    def _ensure_dir(self, dirpath: Path) -> None:
+        """
+        确保目录存在
+        
+        已创建的目录会被记录下来，同一目录在一次构建中只调用一次 mkdir
+        
+        Args:
+            dirpath: 目录路径
+        """
+        if dirpath not in self._created_dirs:
+            dirpath.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(dirpath)
+    
+    def _open_output(self, filepath: Path) -> TextIO:
+        """
+        打开输出文件用于流式写入
+        
+        使用 1 MiB 写缓冲区，内容较多的文件（RSS、Sitemap 等）可以边生成边写入，
+        无需先在内存中拼接完整字符串
+        
+        Args:
+            filepath: 文件路径
+            
+        Returns:
+            文本文件对象
+        """
+        self._ensure_dir(filepath.parent)
+        return open(filepath, 'w', encoding='utf-8', newline='\n', buffering=OUTPUT_BUFFER_SIZE)
+    
     def _copy_post_images(self) -> None:
         """
         复制文章中引用的图片到输出目录
         
-        将所有文章中引用的相对路径图片复制到 assets/images 目录
+        将所有文章中引用的相对路径图片复制到 assets/images 目录。
+        先收集所有需要复制的文件（同一图片只复制一次），再批量并发复制
         """
         images_dest = self.output_dir / 'assets' / 'images'
-        images_dest.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(images_dest)
+        
+        md_dir = self._flags.md_dir
+        
+        # 文章中记录的图片路径都是解析后的绝对路径，直接按字符串前缀计算相对路径
+        md_prefix = str(md_dir) + os.sep
         
-        copied_count = 0
+        # 目标路径 -> 源路径
+        pending: Dict[Path, Path] = {}
+        
+        # 已处理的图片路径，避免重复的 stat 系统调用
+        seen: Set[str] = set()
         
         for post in self.posts:
             if not post.images:
                 continue
             
             for img_path in post.images:
-                img_src = Path(img_path)
+                # 同一图片只处理一次
+                if img_path in seen:
+                    continue
+                seen.add(img_path)
                 
-                if not img_src.exists():
+                if not os.path.exists(img_path):
                     print(f"  警告: 图片不存在: {img_path}")
                     continue
                 
                 # 获取图片相对于 md 目录的路径
-                try:
-                    # 假设 md_dir 是 'md'
-                    md_dir = Path(self.config.get('build.md_dir', 'md')).resolve()
-                    rel_path = img_src.relative_to(md_dir)
-                    
-                    # 目标路径
-                    img_dest = images_dest / rel_path
-                    
-                    # 确保目标目录存在
-                    img_dest.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # 复制文件
-                    shutil.copy2(img_src, img_dest)
-                    copied_count += 1
-                    
-                except ValueError:
+                if not img_path.startswith(md_prefix):
                     # 图片不在 md_dir 下，跳过
                     print(f"  警告: 图片不在 md 目录下: {img_path}")
                     continue
-                except Exception as e:
-                    print(f"  警告: 复制图片失败 {img_path}: {e}")
-                    continue
+                
+                # 目标路径
+                img_dest = images_dest / img_path[len(md_prefix):]
+                
+                # 确保目标目录存在
+                self._ensure_dir(img_dest.parent)
+                
+                pending[img_dest] = Path(img_path)
+        
+        copied_count = self._copy_files(pending)
         
         if copied_count > 0:
             print(f"✓ 文章图片已复制: {copied_count} 个文件")
     
-    def _sanitize_filename(self, name: str) -> str:
+    def _copy_files(self, files: Dict[Path, Path]) -> int:
+        """
+        批量复制文件
+        
+        所有复制任务一次性提交到线程池，os.copy_file_range 等系统调用
+        执行期间会释放 GIL，多个文件的复制可以重叠进行
+        
+        Args:
+            files: 目标路径到源路径的映射（目标目录需已存在）
+            
+        Returns:
+            成功复制的文件数
+        """
+        if not files:
+            return 0
+        
+        def copy_one(item: Tuple[Path, Path]) -> bool:
+            dst, src = item
+            try:
+                _fast_copy(src, dst)
+                return True
+            except Exception as e:
+                print(f"  警告: 复制图片失败 {src}: {e}")
+                return False
+        
+        with ThreadPoolExecutor() as executor:
+            return sum(executor.map(copy_one, files.items()))
+    
+    def _get_tags_map(self) -> Dict[str, List[Post]]:
+        """
+        获取标签到文章列表的映射（只计算一次）
+        
+        按标签名排序，标签页和 Sitemap 的生成顺序不随文章顺序变化
+        
+        Returns:
+            标签到文章列表的映射
+        """
+        if self._tags_map_cache is None:
+            self._tags_map_cache = dict(sorted(self.renderer.get_all_tags(self.posts).items()))
+        return self._tags_map_cache
+    
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _sanitize_filename(name: str) -> str:
         """
         清理文件名，移除或替换不安全的字符
         
@@ -335,11 +697,9 @@ class StaticGenerator:
         Returns:
             安全的文件名
         """
-        import re
-        
         # 替换空格和特殊字符为连字符
-        safe_name = re.sub(r'[^\w\s\u4e00-\u9fff-]', '', name)
-        safe_name = re.sub(r'[\s_]+', '-', safe_name)
+        safe_name = _UNSAFE_CHARS.sub('', name)
+        safe_name = _WS_RUN.sub('-', safe_name)
         safe_name = safe_name.strip('-').lower()
         
         # 如果结果为空，使用默认名称
@@ -352,66 +712,57 @@ class StaticGenerator:
         """
         生成 RSS 订阅文件
         
-        生成符合 RSS 2.0 标准的 XML 文件
+        生成符合 RSS 2.0 标准的 XML 文件，边生成边写入文件
         """
         try:
             from datetime import datetime
             import html
             
-            site_config = self.config.get_site_config()
-            site_url = site_config.get('url', 'https://example.com').rstrip('/')
-            
-            # 获取 base_path（用于子目录部署）
-            base_path = site_config.get('base_path', '').strip()
-            if base_path and not base_path.startswith('/'):
-                base_path = '/' + base_path
-            if base_path.endswith('/'):
-                base_path = base_path[:-1]
-            
-            # RSS 头部
-            rss_lines = [
-                '<?xml version="1.0" encoding="UTF-8"?>',
-                '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">',
-                '<channel>',
-                f'  <title>{html.escape(site_config.get("title", "博客"))}</title>',
-                f'  <link>{html.escape(site_url)}{base_path}/</link>',
-                f'  <description>{html.escape(site_config.get("description", ""))}</description>',
-                f'  <language>{site_config.get("language", "zh-CN")}</language>',
-                f'  <atom:link href="{html.escape(site_url)}{base_path}/rss.xml" rel="self" type="application/rss+xml" />',
-            ]
+            site_config = self._site_config
+            site_url = self._site_url
+            base_path = self._base_path
             
-            # 添加文章（最多 20 篇）
-            for post in self.posts[:20]:
-                post_url = f'{site_url}{base_path}/posts/{post.relative_path}.html'
-                pub_date = post.date.strftime('%a, %d %b %Y %H:%M:%S +0000')
-                
-                # 清理 HTML 内容作为描述
-                description = post.description or post.html[:200]
-                
-                rss_lines.extend([
-                    '  <item>',
-                    f'    <title>{html.escape(post.title)}</title>',
-                    f'    <link>{html.escape(post_url)}</link>',
-                    f'    <description>{html.escape(description)}</description>',
-                    f'    <pubDate>{pub_date}</pubDate>',
-                    f'    <guid>{html.escape(post_url)}</guid>',
-                ])
-                
-                # 添加分类（标签）
-                for tag in post.tags:
-                    rss_lines.append(f'    <category>{html.escape(tag)}</category>')
-                
-                rss_lines.append('  </item>')
+            # 站点根 URL 是常量，只转义一次；转义按字符进行，拼接前后分别转义结果不变
+            site_root = html.escape(f'{site_url}{base_path}')
             
-            rss_lines.extend([
-                '</channel>',
-                '</rss>'
-            ])
-            
-            # 写入文件
-            rss_content = '\n'.join(rss_lines)
             rss_path = self.output_dir / 'rss.xml'
-            self._write_file(rss_path, rss_content)
+            with self._open_output(rss_path) as f:
+                # RSS 头部
+                f.write(
+                    '<?xml version="1.0" encoding="UTF-8"?>\n'
+                    '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n'
+                    '<channel>\n'
+                    f'  <title>{html.escape(site_config.get("title", "博客"))}</title>\n'
+                    f'  <link>{site_root}/</link>\n'
+                    f'  <description>{html.escape(site_config.get("description", ""))}</description>\n'
+                    f'  <language>{site_config.get("language", "zh-CN")}</language>\n'
+                    f'  <atom:link href="{site_root}/rss.xml" rel="self" type="application/rss+xml" />\n'
+                )
+                
+                # 添加文章（最多 20 篇）
+                for post in self.posts[:20]:
+                    post_url = site_root + html.escape(post.url_path)
+                    pub_date = post.date.strftime('%a, %d %b %Y %H:%M:%S +0000')
+                    
+                    # 清理 HTML 内容作为描述（post.html 是 Markup，转为普通字符串后再转义）
+                    description = post.description or str(post.html[:200])
+                    
+                    f.write(
+                        '  <item>\n'
+                        f'    <title>{html.escape(post.title)}</title>\n'
+                        f'    <link>{post_url}</link>\n'
+                        f'    <description>{html.escape(description)}</description>\n'
+                        f'    <pubDate>{pub_date}</pubDate>\n'
+                        f'    <guid>{post_url}</guid>\n'
+                    )
+                    
+                    # 添加分类（标签）
+                    for tag in post.tags:
+                        f.write(f'    <category>{html.escape(tag)}</category>\n')
+                    
+                    f.write('  </item>\n')
+                
+                f.write('</channel>\n</rss>')
             
             print(f"  ✓ RSS 订阅: rss.xml")
         except Exception as e:
@@ -421,93 +772,90 @@ class StaticGenerator:
         """
         生成 Sitemap 文件
         
-        生成符合 Sitemap 协议的 XML 文件
+        生成符合 Sitemap 协议的 XML 文件，边生成边写入文件
         """
         try:
             from datetime import datetime
             import html
             
-            site_config = self.config.get_site_config()
-            site_url = site_config.get('url', 'https://example.com').rstrip('/')
+            site_config = self._site_config
+            site_url = self._site_url
+            base_path = self._base_path
             
-            # 获取 base_path（用于子目录部署）
-            base_path = site_config.get('base_path', '').strip()
-            if base_path and not base_path.startswith('/'):
-                base_path = '/' + base_path
-            if base_path.endswith('/'):
-                base_path = base_path[:-1]
+            # 非文章页面的 lastmod 统一使用构建日期
+            today = datetime.now().strftime('%Y-%m-%d')
             
-            # Sitemap 头部
-            sitemap_lines = [
-                '<?xml version="1.0" encoding="UTF-8"?>',
-                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
-            ]
+            # 站点根 URL 是常量，只转义一次
+            site_root = html.escape(f'{site_url}{base_path}')
             
-            # 首页
-            sitemap_lines.extend([
-                '  <url>',
-                f'    <loc>{html.escape(site_url)}{base_path}/</loc>',
-                f'    <lastmod>{datetime.now().strftime("%Y-%m-%d")}</lastmod>',
-                '    <changefreq>daily</changefreq>',
-                '    <priority>1.0</priority>',
-                '  </url>',
-            ])
-            
-            # 归档页
-            sitemap_lines.extend([
-                '  <url>',
-                f'    <loc>{html.escape(site_url)}{base_path}/archive.html</loc>',
-                f'    <lastmod>{datetime.now().strftime("%Y-%m-%d")}</lastmod>',
-                '    <changefreq>weekly</changefreq>',
-                '    <priority>0.8</priority>',
-                '  </url>',
-            ])
-            
-            # 标签索引页
-            sitemap_lines.extend([
-                '  <url>',
-                f'    <loc>{html.escape(site_url)}{base_path}/tags/</loc>',
-                f'    <lastmod>{datetime.now().strftime("%Y-%m-%d")}</lastmod>',
-                '    <changefreq>weekly</changefreq>',
-                '    <priority>0.8</priority>',
-                '  </url>',
-            ])
-            
-            # 所有文章
-            for post in self.posts:
-                post_url = f'{site_url}{base_path}/posts/{post.relative_path}.html'
-                lastmod = post.date.strftime('%Y-%m-%d')
+            sitemap_path = self.output_dir / 'sitemap.xml'
+            with self._open_output(sitemap_path) as f:
+                # Sitemap 头部
+                f.write(
+                    '<?xml version="1.0" encoding="UTF-8"?>\n'
+                    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+                )
                 
-                sitemap_lines.extend([
-                    '  <url>',
-                    f'    <loc>{html.escape(post_url)}</loc>',
-                    f'    <lastmod>{lastmod}</lastmod>',
-                    '    <changefreq>monthly</changefreq>',
-                    '    <priority>0.6</priority>',
-                    '  </url>',
-                ])
-            
-            # 所有标签页
-            tags_map = self.renderer.get_all_tags(self.posts)
-            for tag in tags_map.keys():
-                tag_filename = self._sanitize_filename(tag)
-                tag_url = f'{site_url}{base_path}/tags/{tag_filename}.html'
+                # 首页
+                f.write(
+                    '  <url>\n'
+                    f'    <loc>{site_root}/</loc>\n'
+                    f'    <lastmod>{today}</lastmod>\n'
+                    '    <changefreq>daily</changefreq>\n'
+                    '    <priority>1.0</priority>\n'
+                    '  </url>\n'
+                )
                 
-                sitemap_lines.extend([
-                    '  <url>',
-                    f'    <loc>{html.escape(tag_url)}</loc>',
-                    f'    <lastmod>{datetime.now().strftime("%Y-%m-%d")}</lastmod>',
-                    '    <changefreq>weekly</changefreq>',
-                    '    <priority>0.5</priority>',
-                    '  </url>',
-                ])
-            
-            sitemap_lines.append('</urlset>')
-            
-            # 写入文件
-            sitemap_content = '\n'.join(sitemap_lines)
-            sitemap_path = self.output_dir / 'sitemap.xml'
-            self._write_file(sitemap_path, sitemap_content)
+                # 归档页
+                f.write(
+                    '  <url>\n'
+                    f'    <loc>{site_root}/archive.html</loc>\n'
+                    f'    <lastmod>{today}</lastmod>\n'
+                    '    <changefreq>weekly</changefreq>\n'
+                    '    <priority>0.8</priority>\n'
+                    '  </url>\n'
+                )
+                
+                # 标签索引页
+                f.write(
+                    '  <url>\n'
+                    f'    <loc>{site_root}/tags/</loc>\n'
+                    f'    <lastmod>{today}</lastmod>\n'
+                    '    <changefreq>weekly</changefreq>\n'
+                    '    <priority>0.8</priority>\n'
+                    '  </url>\n'
+                )
+                
+                # 所有文章
+                for post in self.posts:
+                    post_url = site_root + html.escape(post.url_path)
+                    lastmod = post.date.strftime('%Y-%m-%d')
+                    
+                    f.write(
+                        '  <url>\n'
+                        f'    <loc>{post_url}</loc>\n'
+                        f'    <lastmod>{lastmod}</lastmod>\n'
+                        '    <changefreq>monthly</changefreq>\n'
+                        '    <priority>0.6</priority>\n'
+                        '  </url>\n'
+                    )
+                
+                # 所有标签页（清理后的文件名不含需要转义的字符）
+                tags_map = self._get_tags_map()
+                for tag in tags_map.keys():
+                    tag_filename = self._sanitize_filename(tag)
+                    tag_url = f'{site_root}/tags/{tag_filename}.html'
+                    
+                    f.write(
+                        '  <url>\n'
+                        f'    <loc>{tag_url}</loc>\n'
+                        f'    <lastmod>{today}</lastmod>\n'
+                        '    <changefreq>weekly</changefreq>\n'
+                        '    <priority>0.5</priority>\n'
+                        '  </url>\n'
+                    )
+                
+                f.write('</urlset>')
             
             print(f"  ✓ Sitemap: sitemap.xml")
         except Exception as e:
@@ -523,26 +871,20 @@ class StaticGenerator:
             import json
             from datetime import datetime
             
-            # 获取 base_path（用于子目录部署）
-            site_config = self.config.get_site_config()
-            base_path = site_config.get('base_path', '').strip()
-            if base_path and not base_path.startswith('/'):
-                base_path = '/' + base_path
-            if base_path.endswith('/'):
-                base_path = base_path[:-1]
+            base_path = self._base_path
             
             # 构建搜索索引数据
-            posts_data = []
-            for post in self.posts:
-                post_data = {
+            posts_data = [
+                {
                     'title': post.title,
-                    'url': f'{base_path}/posts/{post.relative_path}.html',
+                    'url': base_path + post.url_path,
                     'date': post.date.isoformat(),
                     'tags': post.tags,
                     'description': post.description,
                     'relative_path': post.relative_path
                 }
-                posts_data.append(post_data)
+                for post in self.posts
+            ]
             
             # 创建完整的索引对象
             search_index = {
@@ -551,10 +893,13 @@ class StaticGenerator:
                 'total_posts': len(posts_data)
             }
             
-            # 写入 JSON 文件
+            # 序列化到 JSON 文件（优先使用 orjson）
             index_path = self.output_dir / 'search-index.json'
-            json_content = json.dumps(search_index, ensure_ascii=False, indent=2)
-            self._write_file(index_path, json_content)
+            if orjson is not None:
+                index_path.write_bytes(orjson.dumps(search_index, option=orjson.OPT_INDENT_2))
+            else:
+                with self._open_output(index_path) as f:
+                    json.dump(search_index, f, ensure_ascii=False, indent=2)
             
             print(f"  ✓ 搜索索引: search-index.json ({len(posts_data)} 篇文章)")
         except Exception as e:
@@ -3,16 +3,86 @@
 Markdown 处理模块
 负责解析 Markdown 文件、提取 frontmatter 元数据、转换为 HTML
 """
+import hashlib
+import os
+import pickle
 import re
+import stat
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, Iterator, List, Tuple, Optional
 import frontmatter
 import markdown
+import yaml
+from markdown.extensions.toc import slugify
+from markupsafe import Markup
 
+try:
+    import mistune
+    from mistune.toc import add_toc_hook, render_toc_ul
+except ImportError:  # mistune 为可选依赖，仅在配置 markdown_engine 为 mistune 时使用
+    mistune = None
 
-@dataclass
+try:
+    import pygments
+    from pygments import highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+except ImportError:  # 未安装 Pygments 时代码块不高亮
+    pygments = None
+    highlight = None
+
+
+# Markdown 扩展配置
+MARKDOWN_EXTENSIONS = [
+    'extra',           # 支持表格、代码块等扩展语法
+    'codehilite',      # 代码高亮
+    'toc',             # 目录生成
+    'meta',            # 元数据支持
+    'nl2br',           # 换行转 <br>
+    'sane_lists'       # 更好的列表处理
+]
+MARKDOWN_EXTENSION_CONFIGS = {
+    'codehilite': {
+        'css_class': 'highlight',
+        'linenums': False
+    }
+}
+
+# 可选的 Markdown 引擎：markdown (Python-Markdown，默认) / mistune（更快，需要安装 mistune>=3）
+MARKDOWN_ENGINES = ('markdown', 'mistune')
+
+# mistune 引擎使用的插件，对应 Python-Markdown 的 extra 扩展
+MISTUNE_PLUGINS = ['table', 'footnotes', 'strikethrough', 'task_lists', 'url', 'def_list', 'abbr']
+
+# 文章解析缓存格式版本，缓存结构或解析逻辑变化时递增
+CACHE_VERSION = 3
+
+# YAML frontmatter 分隔行（与 python-frontmatter 的 YAMLHandler 一致）
+_FM_BOUNDARY = re.compile(r'^-{3,}\s*$', re.MULTILINE)
+
+# 优先使用 libyaml 的 C 实现解析 frontmatter
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Markdown 图片引用: ![alt](path)
+_IMG_PATTERN = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)')
+
+# slug 生成：移除特殊字符、将空白和下划线替换为连字符
+_SLUG_STRIP = re.compile(r'[^\w\s\u4e00-\u9fff-]')
+_SLUG_DASH = re.compile(r'[\s_]+')
+
+# 可直接交给 datetime.fromisoformat 解析的日期格式（与 _parse_date 支持的格式一一对应）
+_ISO_DATE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}(?:[ T][0-9]{2}:[0-9]{2}:[0-9]{2})?'
+                       r'|[0-9]{4}/[0-9]{2}/[0-9]{2}(?: [0-9]{2}:[0-9]{2}:[0-9]{2})?')
+
+# 需要解析的文件数少于此值时串行解析，进程池的启动开销得不偿失
+PARALLEL_MIN_FILES = 16
+
+
+@dataclass(slots=True)
 class Post:
     """文章数据模型"""
     filepath: str              # 源文件路径
@@ -29,37 +99,143 @@ class Post:
     password: str = ""         # 加密密码
     metadata: Dict[str, Any] = field(default_factory=dict)  # 其他元数据
     images: List[str] = field(default_factory=list)  # 文章中引用的图片路径
+    url_path: str = field(init=False, default='')  # 文章页相对站点根目录的 URL 路径
+    year: int = field(init=False, default=0)  # 发布年份（归档页分组用）
+    month: int = field(init=False, default=0)  # 发布月份（归档页分组用）
+    
+    def __post_init__(self):
+        # 文章页 URL 在 RSS、Sitemap、搜索索引中多处使用，构造时计算一次
+        self.url_path = f'/posts/{self.relative_path}.html'
+        self.year = self.date.year
+        self.month = self.date.month
+
+
+def _iter_md_files(root: str) -> Iterator[os.DirEntry]:
+    """
+    递归遍历目录下的所有 .md 文件
+    
+    基于 os.scandir 实现，目录项类型信息直接来自目录读取结果，无需逐个 stat；
+    遍历顺序与 Path.rglob 一致（先当前目录的文件，再依次进入子目录），
+    不跟随指向目录的符号链接
+    
+    Args:
+        root: 根目录路径
+        
+    Yields:
+        .md 文件的目录项
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except PermissionError:
+        return
+    
+    subdirs = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        if is_dir:
+            subdirs.append(entry.path)
+        elif entry.name.endswith('.md'):
+            yield entry
+    
+    for subdir in subdirs:
+        yield from _iter_md_files(subdir)
+
+
+def _read_file(path: Path) -> bytes:
+    """
+    读取整个文件
+    
+    支持的平台上通过 posix_fadvise 提示内核顺序读取，冷缓存时可以提前预读
+    
+    Args:
+        path: 文件路径
+        
+    Returns:
+        文件内容
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        
+        chunks = []
+        while True:
+            chunk = os.read(fd, 1 << 20)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b''.join(chunks)
+    finally:
+        os.close(fd)
+
+
+if mistune is not None:
+    class _HighlightRenderer(mistune.HTMLRenderer):
+        """
+        mistune HTML 渲染器
+        
+        标注了语言的代码块使用 Pygments 高亮，输出的 CSS 类与 codehilite 扩展一致
+        """
+        
+        def block_code(self, code: str, info: Optional[str] = None) -> str:
+            lang = info.strip().split(None, 1)[0] if info and info.strip() else ''
+            if lang and highlight is not None:
+                try:
+                    lexer = get_lexer_by_name(lang)
+                except ClassNotFound:
+                    lexer = None
+                if lexer is not None:
+                    return highlight(code, lexer, HtmlFormatter(cssclass='highlight', wrapcode=True))
+            return super().block_code(code, info)
 
 
 class MarkdownProcessor:
     """Markdown 处理器"""
     
-    def __init__(self, md_dir: str, base_path: str = ""):
+    def __init__(self, md_dir: str, base_path: str = "", use_cache: bool = True,
+                 workers: Optional[int] = None, engine: str = 'markdown'):
         """
         初始化 Markdown 处理器
         
         Args:
             md_dir: Markdown 文件目录路径
             base_path: 基础路径前缀（用于子目录部署）
+            use_cache: 是否使用文章解析缓存（未修改的文件直接复用上次的解析结果）
+            workers: 并行解析的进程数，None 表示使用 CPU 核数，1 表示串行解析
+            engine: Markdown 引擎，'markdown' 或 'mistune'
         """
         self.md_dir = Path(md_dir).resolve()
         self.base_path = base_path.rstrip('/') if base_path else ""
+        self.workers = workers or os.cpu_count() or 1
         self.md_converter = markdown.Markdown(
-            extensions=[
-                'extra',           # 支持表格、代码块等扩展语法
-                'codehilite',      # 代码高亮
-                'toc',             # 目录生成
-                'meta',            # 元数据支持
-                'nl2br',           # 换行转 <br>
-                'sane_lists'       # 更好的列表处理
-            ],
-            extension_configs={
-                'codehilite': {
-                    'css_class': 'highlight',
-                    'linenums': False
-                }
-            }
+            extensions=MARKDOWN_EXTENSIONS,
+            extension_configs=MARKDOWN_EXTENSION_CONFIGS
         )
+        
+        # 可选的 mistune 引擎
+        if engine not in MARKDOWN_ENGINES:
+            raise ValueError(f"不支持的 Markdown 引擎: {engine}")
+        if engine == 'mistune' and mistune is None:
+            print("警告: 未安装 mistune，使用默认的 markdown 引擎")
+            engine = 'markdown'
+        self.engine = engine
+        self._mistune = self._create_mistune() if engine == 'mistune' else None
+        
+        # 图片目录的真实路径: 目录路径 -> realpath 结果（同一目录下的图片只解析一次）
+        self._realdir_cache: Dict[str, str] = {}
+        self._md_prefix = os.path.join(str(self.md_dir), '')
+        
+        # 文章解析缓存: 文件路径 -> (mtime_ns, size, Post)
+        self.use_cache = use_cache
+        self._cache_path = self.md_dir.parent / '.mblog_cache' / 'posts.pkl'
+        self._cache: Dict[str, Tuple[int, int, Post]] = {}
+        self._cache_dirty = False
+        if use_cache:
+            self._load_cache()
     
     def load_posts(self) -> List[Post]:
         """
@@ -71,20 +247,185 @@ class MarkdownProcessor:
         if not self.md_dir.exists():
             return []
         
-        posts = []
         # 递归查找所有 .md 文件
-        for md_file in self.md_dir.rglob('*.md'):
+        entries = list(_iter_md_files(str(self.md_dir)))
+        md_files = [entry.path for entry in entries]
+        
+        # 先从缓存中取出未修改的文章，其余文件需要重新解析
+        parsed: Dict[str, Post] = {}
+        pending: List[Tuple[str, Optional[os.stat_result]]] = []
+        for entry in entries:
+            md_file = entry.path
             try:
-                post = self.parse_post(str(md_file))
-                posts.append(post)
-            except Exception as e:
+                st = entry.stat() if self.use_cache else None
+            except OSError as e:
                 print(f"警告: 无法解析文件 {md_file}: {e}")
                 continue
+            
+            post = self._lookup_cache(md_file, st)
+            if post is not None:
+                parsed[md_file] = post
+            else:
+                pending.append((md_file, st))
+        
+        results = self._parse_files(pending)
+        for (md_file, st), (post, cacheable, error) in zip(pending, results):
+            if post is None:
+                print(f"警告: 无法解析文件 {md_file}: {error}")
+                continue
+            
+            parsed[md_file] = post
+            if cacheable:
+                self._store_cache(post, st)
+        
+        posts = [parsed[md_file] for md_file in md_files if md_file in parsed]
+        
+        if self.use_cache:
+            self._save_cache(posts)
         
         # 按日期降序排序（最新的在前）
         posts.sort(key=lambda p: p.date, reverse=True)
         return posts
     
+    def _parse_files(self, files: List[Tuple[str, Optional[os.stat_result]]]
+                     ) -> List[Tuple[Optional[Post], bool, str]]:
+        """
+        解析一批文章文件
+        
+        文件数量足够多时使用进程池并行解析（Markdown 转换是 CPU 密集型操作），
+        否则在当前进程串行解析。返回结果的顺序与 files 一致
+        
+        Args:
+            files: (文章文件路径, 文件 stat 结果或 None) 列表
+            
+        Returns:
+            (Post 对象或 None, 是否可缓存, 错误信息) 列表
+        """
+        if self.workers <= 1 or len(files) < PARALLEL_MIN_FILES:
+            return [self._try_parse(filepath, st) for filepath, st in files]
+        
+        chunksize = max(1, len(files) // (4 * self.workers))
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_parse_worker,
+            initargs=(str(self.md_dir), self.base_path, self.engine)
+        ) as executor:
+            return list(executor.map(_parse_in_worker, files, chunksize=chunksize))
+    
+    def _try_parse(self, filepath: str, st: Optional[os.stat_result] = None
+                   ) -> Tuple[Optional[Post], bool, str]:
+        """
+        解析单个文章文件，捕获解析错误
+        
+        Args:
+            filepath: 文章文件路径
+            st: 已获取的文件 stat 结果（可选）
+            
+        Returns:
+            (Post 对象或 None, 是否可缓存, 错误信息)
+        """
+        try:
+            post, cacheable = self._parse_file(Path(filepath), st)
+            return post, cacheable, ''
+        except Exception as e:
+            return None, False, str(e)
+    
+    def _lookup_cache(self, filepath: str, st: Optional[os.stat_result]) -> Optional[Post]:
+        """
+        查找未修改文件的缓存解析结果
+        
+        Args:
+            filepath: 文章文件路径
+            st: 文件的 stat 结果
+            
+        Returns:
+            缓存的 Post 对象，未命中时返回 None
+        """
+        if not self.use_cache or st is None:
+            return None
+        
+        entry = self._cache.get(filepath)
+        if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            return entry[2]
+        return None
+    
+    def _store_cache(self, post: Post, st: Optional[os.stat_result]) -> None:
+        """
+        记录文章的解析结果
+        
+        Args:
+            post: Post 对象
+            st: 解析前获取的文件 stat 结果
+        """
+        if not self.use_cache or st is None:
+            return
+        
+        self._cache[post.filepath] = (st.st_mtime_ns, st.st_size, post)
+        self._cache_dirty = True
+    
+    def _cache_signature(self) -> str:
+        """
+        计算影响解析结果的配置签名
+        
+        Markdown 扩展配置、base_path 或转换库版本变化时，已缓存的 HTML 不再有效
+        
+        Returns:
+            配置签名字符串
+        """
+        versions = (
+            markdown.__version__,
+            mistune.__version__ if mistune is not None else None,
+            pygments.__version__ if pygments is not None else None,
+        )
+        source = repr((CACHE_VERSION, self.engine, versions, MARKDOWN_EXTENSIONS,
+                       MARKDOWN_EXTENSION_CONFIGS, MISTUNE_PLUGINS, self.base_path, str(self.md_dir)))
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+    
+    def _load_cache(self) -> None:
+        """
+        加载文章解析缓存
+        
+        缓存文件不存在、损坏或配置签名不一致时使用空缓存
+        """
+        try:
+            with open(self._cache_path, 'rb') as f:
+                data = pickle.load(f)
+            if data.get('signature') == self._cache_signature():
+                self._cache = data['entries']
+        except Exception:
+            self._cache = {}
+    
+    def _save_cache(self, posts: List[Post]) -> None:
+        """
+        保存文章解析缓存
+        
+        只保留本次加载到的文章（已删除的文件从缓存中移除），
+        先写入临时文件再原子替换，避免中断时留下损坏的缓存
+        
+        Args:
+            posts: 本次加载的文章列表
+        """
+        loaded = {post.filepath for post in posts}
+        if not self._cache_dirty and loaded == self._cache.keys():
+            return
+        
+        entries = {path: entry for path, entry in self._cache.items() if path in loaded}
+        
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._cache_path.with_name(f'{self._cache_path.name}.{os.getpid()}.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(
+                    {'signature': self._cache_signature(), 'entries': entries},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_path, self._cache_path)
+            self._cache = entries
+            self._cache_dirty = False
+        except Exception as e:
+            print(f"警告: 无法写入文章缓存 {self._cache_path}: {e}")
+    
     def parse_post(self, filepath: str) -> Post:
         """
         解析单个文章文件
@@ -100,9 +441,38 @@ class MarkdownProcessor:
         """
         filepath_obj = Path(filepath)
         
-        # 读取文件内容
-        with open(filepath_obj, 'r', encoding='utf-8') as f:
-            file_content = f.read()
+        # 文件未修改时直接复用缓存的解析结果
+        st = filepath_obj.stat() if self.use_cache else None
+        post = self._lookup_cache(str(filepath_obj), st)
+        if post is not None:
+            return post
+        
+        post, cacheable = self._parse_file(filepath_obj, st)
+        if cacheable:
+            self._store_cache(post, st)
+        
+        return post
+    
+    def _parse_file(self, filepath_obj: Path, st: Optional[os.stat_result] = None) -> Tuple[Post, bool]:
+        """
+        读取并解析文章文件（不使用缓存）
+        
+        Args:
+            filepath_obj: 文章文件路径
+            st: 已获取的文件 stat 结果（可选，用于避免重复 stat）
+            
+        Returns:
+            (Post 对象, 解析结果是否可缓存)
+            
+        Raises:
+            ValueError: 如果文件格式错误或缺少必需字段
+        """
+        # 读取文件内容（一次读取字节后解码，避免文本 I/O 包装层的开销）
+        file_content = _read_file(filepath_obj).decode('utf-8')
+        
+        # 与文本模式读取一致，统一换行符
+        if '\r' in file_content:
+            file_content = file_content.replace('\r\n', '\n').replace('\r', '\n')
         
         # 提取 frontmatter 和内容
         metadata, content = self._extract_frontmatter(file_content)
@@ -119,7 +489,9 @@ class MarkdownProcessor:
             date = self._parse_date(metadata['date'])
         else:
             # 如果没有日期，使用文件修改时间
-            date = datetime.fromtimestamp(filepath_obj.stat().st_mtime)
+            if st is None:
+                st = filepath_obj.stat()
+            date = datetime.fromtimestamp(st.st_mtime)
         
         # 提取其他字段
         author = metadata.get('author', '')
@@ -129,7 +501,8 @@ class MarkdownProcessor:
             tags = [tag.strip() for tag in tags.split(',')]
         
         # 提取图片路径并转换 Markdown 到 HTML
-        images, html = self._process_markdown_with_images(content, filepath_obj)
+        unresolved: List[str] = []
+        images, html = self._process_markdown_with_images(content, filepath_obj, unresolved)
         
         # 生成 slug
         slug = self._generate_slug(title, date)
@@ -152,14 +525,15 @@ class MarkdownProcessor:
             description=description,
             tags=tags,
             content=content,
-            html=html,
+            html=Markup(html),  # 已是安全的 HTML，模板渲染时无需再转义
             encrypted=encrypted,
             password=password,
             metadata=metadata,
             images=images
         )
         
-        return post
+        # 引用了不存在的本地图片时不缓存，图片补上后下次构建会重新解析
+        return post, not unresolved
     
     def _extract_frontmatter(self, content: str) -> Tuple[Dict[str, Any], str]:
         """
@@ -172,8 +546,21 @@ class MarkdownProcessor:
             (元数据字典, Markdown 内容)
         """
         try:
-            post = frontmatter.loads(content)
-            return dict(post.metadata), post.content
+            text = content.strip()
+            
+            # YAML frontmatter 直接切分并用 C 加速的解析器解析，
+            # 其他格式（TOML、JSON 等）交给 frontmatter 库处理
+            if not _FM_BOUNDARY.match(text):
+                post = frontmatter.loads(content)
+                return dict(post.metadata), post.content
+            
+            parts = _FM_BOUNDARY.split(text, 2)
+            if len(parts) != 3:
+                return {}, text
+            
+            _, fm, body = parts
+            metadata = yaml.load(fm, Loader=_YAML_LOADER)
+            return (dict(metadata) if isinstance(metadata, dict) else {}), body.strip()
         except Exception as e:
             # 如果没有 frontmatter，返回空元数据
             return {}, content
@@ -182,13 +569,20 @@ class MarkdownProcessor:
         """
         转换 Markdown 到 HTML
         
+        每次调用转换一篇完整的文章。转换器在处理器（及每个解析子进程）中
+        只创建一次并反复使用，转换前的 reset() 清除上一篇文章遗留的目录、
+        脚注等状态，开销远小于重新创建转换器
+        
         Args:
             markdown_text: Markdown 文本
             
         Returns:
             HTML 字符串
         """
-        # 重置转换器状态
+        if self._mistune is not None:
+            return self._convert_with_mistune(markdown_text)
+        
+        # 重置转换器状态（清除上一篇文章的目录、脚注等）
         self.md_converter.reset()
         
         # 转换
@@ -196,6 +590,46 @@ class MarkdownProcessor:
         
         return html
     
+    def _create_mistune(self) -> Any:
+        """
+        创建 mistune 转换器
+        
+        行为尽量与默认的 Python-Markdown 扩展组合保持一致：
+        换行转 <br>、标题生成与 toc 扩展相同的 id、支持 [TOC] 标记
+        
+        Returns:
+            mistune.Markdown 实例
+        """
+        md = mistune.create_markdown(
+            escape=False,
+            hard_wrap=True,
+            renderer=_HighlightRenderer(escape=False),
+            plugins=MISTUNE_PLUGINS
+        )
+        add_toc_hook(md, heading_id=lambda token, index: slugify(token['text'], '-'))
+        return md
+    
+    def _convert_with_mistune(self, markdown_text: str) -> str:
+        """
+        使用 mistune 转换 Markdown 到 HTML
+        
+        mistune 每次转换都使用新的解析状态，无需重置
+        
+        Args:
+            markdown_text: Markdown 文本
+            
+        Returns:
+            HTML 字符串
+        """
+        html, state = self._mistune.parse(markdown_text)
+        
+        # 只有出现 [TOC] 标记时才生成目录
+        if '[TOC]' in markdown_text:
+            toc = render_toc_ul(state.env.get('toc_items', []))
+            html = html.replace('<p>[TOC]</p>', f'<div class="toc">\n{toc}\n</div>')
+        
+        return html
+    
     def _generate_slug(self, title: str, date: datetime) -> str:
         """
         生成 URL slug
@@ -217,8 +651,8 @@ class MarkdownProcessor:
         
         # 移除或替换特殊字符
         # 保留字母、数字、中文字符，其他替换为连字符
-        title_slug = re.sub(r'[^\w\s\u4e00-\u9fff-]', '', title_slug)
-        title_slug = re.sub(r'[\s_]+', '-', title_slug)
+        title_slug = _SLUG_STRIP.sub('', title_slug)
+        title_slug = _SLUG_DASH.sub('-', title_slug)
         title_slug = title_slug.strip('-')
         
         # 组合
@@ -245,6 +679,13 @@ class MarkdownProcessor:
             return datetime.combine(date_value, datetime.min.time())
         
         if isinstance(date_value, str):
+            # 常见的标准格式直接用 fromisoformat 解析，比逐个尝试 strptime 快得多
+            if _ISO_DATE.fullmatch(date_value):
+                try:
+                    return datetime.fromisoformat(date_value.replace('/', '-'))
+                except ValueError:
+                    pass
+            
             # 尝试多种日期格式
             formats = [
                 '%Y-%m-%d',
@@ -284,21 +725,59 @@ class MarkdownProcessor:
             # 如果文件不在 md_dir 下，使用文件名（不含扩展名）
             return filepath.stem
     
-    def _process_markdown_with_images(self, markdown_text: str, md_filepath: Path) -> Tuple[List[str], str]:
+    def _resolve_image_path(self, path: str) -> Optional[str]:
+        """
+        解析图片文件的真实路径
+        
+        结果与 Path.resolve() 一致，但所在目录的真实路径按目录缓存，
+        每张图片通常只需一次 lstat
+        
+        Args:
+            path: 图片路径
+            
+        Returns:
+            图片的真实绝对路径，不存在或不是普通文件时返回 None
+        """
+        dirname, name = os.path.split(path)
+        if name in ('', '.', '..'):
+            real_path = os.path.realpath(path)
+        else:
+            real_dir = self._realdir_cache.get(dirname)
+            if real_dir is None:
+                real_dir = self._realdir_cache[dirname] = os.path.realpath(dirname)
+            real_path = os.path.join(real_dir, name)
+        
+        try:
+            st = os.lstat(real_path)
+            if stat.S_ISLNK(st.st_mode):
+                # 图片本身是符号链接，解析到目标文件
+                real_path = os.path.realpath(real_path)
+                st = os.stat(real_path)
+        except (OSError, ValueError):
+            return None
+        
+        return real_path if stat.S_ISREG(st.st_mode) else None
+    
+    def _process_markdown_with_images(self, markdown_text: str, md_filepath: Path,
+                                      unresolved: Optional[List[str]] = None) -> Tuple[List[str], str]:
         """
         处理 Markdown 中的图片引用，提取图片路径并转换路径
         
         Args:
             markdown_text: Markdown 文本
             md_filepath: Markdown 文件的路径
+            unresolved: 如果提供，记录无法解析的本地图片引用
             
         Returns:
             (图片文件路径列表, 转换后的 HTML)
         """
-        images = []
+        # 没有图片引用时跳过正则替换
+        if '![' not in markdown_text:
+            return [], self._convert_to_html(markdown_text)
         
-        # 查找所有图片引用: ![alt](path)
-        img_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
+        images = []
+        md_parent = str(md_filepath.parent)
+        md_prefix = self._md_prefix
         
         def replace_image(match):
             alt_text = match.group(1)
@@ -313,34 +792,58 @@ class MarkdownProcessor:
                 return match.group(0)
             
             # 处理相对路径
-            # 解析图片的绝对路径
-            md_dir = md_filepath.parent
-            img_abs_path = (md_dir / img_path).resolve()
+            # 解析图片的绝对路径（解析符号链接）
+            img_abs_path = self._resolve_image_path(os.path.join(md_parent, img_path))
             
             # 检查图片文件是否存在
-            if img_abs_path.exists() and img_abs_path.is_file():
+            if img_abs_path is not None:
                 # 记录图片路径（相对于 md_dir 的父目录）
-                try:
+                if img_abs_path.startswith(md_prefix):
                     # 获取相对于 markdown 文件所在目录的路径
-                    rel_to_md = img_abs_path.relative_to(self.md_dir)
-                    images.append(str(img_abs_path))
+                    rel_to_md = img_abs_path[len(md_prefix):]
+                    images.append(img_abs_path)
                     
                     # 生成新的图片路径（在输出目录中的路径）
                     # 格式: {base_path}/assets/images/{relative_path}
                     new_img_path = f'{self.base_path}/assets/images/{rel_to_md}'
                     
                     return f'![{alt_text}]({new_img_path})'
-                except ValueError:
-                    # 图片不在 md_dir 下，保持原样
-                    pass
+                # 图片不在 md_dir 下，保持原样
             
             # 如果图片不存在或无法处理，保持原样
+            if unresolved is not None:
+                unresolved.append(img_path)
             return match.group(0)
         
         # 替换所有图片引用
-        processed_markdown = re.sub(img_pattern, replace_image, markdown_text)
+        processed_markdown = _IMG_PATTERN.sub(replace_image, markdown_text)
         
         # 转换为 HTML
         html = self._convert_to_html(processed_markdown)
         
         return images, html
+
+
+# 子进程中的 Markdown 处理器，由 _init_parse_worker 初始化
+_worker_processor: Optional[MarkdownProcessor] = None
+
+
+def _init_parse_worker(md_dir: str, base_path: str, engine: str) -> None:
+    """
+    进程池 worker 初始化函数
+    
+    每个子进程创建一个不使用缓存的处理器，缓存由主进程统一读写
+    
+    Args:
+        md_dir: Markdown 文件目录路径
+        base_path: 基础路径前缀
+        engine: Markdown 引擎
+    """
+    global _worker_processor
+    _worker_processor = MarkdownProcessor(md_dir, base_path=base_path, use_cache=False,
+                                          workers=1, engine=engine)
+
+
+def _parse_in_worker(file: Tuple[str, Optional[os.stat_result]]) -> Tuple[Optional[Post], bool, str]:
+    """在进程池 worker 中解析单个文章文件"""
+    return _worker_processor._try_parse(*file)
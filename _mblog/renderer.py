@@ -2,28 +2,41 @@
 模板渲染模块
 负责使用 Jinja2 模板引擎渲染各种页面
 """
+from collections import defaultdict
+from dataclasses import replace
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, TextIO, Tuple
 from datetime import datetime
 from copy import copy
-import base64
+from functools import lru_cache
+import binascii
 import os
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+import threading
+from jinja2 import (
+    Environment, FileSystemBytecodeCache, FileSystemLoader, Template, TemplateNotFound,
+    select_autoescape
+)
+from markupsafe import Markup
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 from .config import Config
 from .theme import Theme
 from .markdown_processor import Post
 
 # AES-GCM Encryption Constants
-PBKDF2_ITERATIONS = 100_000  # OWASP recommended minimum
+PBKDF2_ITERATIONS = 600_000  # OWASP 2023 recommendation for PBKDF2-HMAC-SHA256
 KEY_SIZE = 32  # 256 bits
 SALT_SIZE = 16  # 128 bits
 NONCE_SIZE = 12  # 96 bits (recommended for GCM)
 
 
+def _b64encode(data: bytes) -> str:
+    """Base64-encode bytes to an ASCII string (no trailing newline)."""
+    return binascii.b2a_base64(data, newline=False).decode('ascii')
+
+
 class RendererError(Exception):
     """渲染器错误"""
     pass
@@ -43,15 +56,34 @@ class Renderer:
         self.theme = theme
         self.config = config
         
+        # 规范化 base_path（用于子目录部署），所有页面共用
+        base_path = config.get_site_config().get('base_path', '').strip()
+        if base_path and not base_path.startswith('/'):
+            base_path = '/' + base_path
+        if base_path.endswith('/'):
+            base_path = base_path[:-1]
+        self._base_path = base_path
+        
         # 初始化 Jinja2 环境
         templates_dir = theme.get_templates_dir()
         self.env = Environment(
-            loader=FileSystemLoader(templates_dir),
-            autoescape=True,  # 自动转义 HTML，防止 XSS
+            # 使用真实路径，使字节码缓存的键与主题目录的写法无关（主进程与子进程共用缓存）
+            loader=FileSystemLoader(os.path.realpath(templates_dir)),
+            autoescape=select_autoescape(('html', 'htm', 'xml'), default=False),  # 自动转义 HTML/XML，防止 XSS
             trim_blocks=True,
-            lstrip_blocks=True
+            lstrip_blocks=True,
+            auto_reload=False,  # 静态构建期间模板不会变化，无需逐次检查修改时间
+            bytecode_cache=self._create_bytecode_cache()
         )
         
+        # 已加载的模板（按模板类型缓存，每次构建只解析一次）
+        self._tpl_cache: Dict[str, Template] = {}
+        
+        # 加密密钥缓存: 密码 -> (Base64 编码的 salt, AESGCM)，同一密码在一次构建中只派生一次密钥
+        self._key_cache: Dict[str, Tuple[str, AESGCM]] = {}
+        # 每个密码一把锁，多线程渲染时其他线程等待首个线程派生完成
+        self._key_locks: Dict[str, threading.Lock] = {}
+        
         # 注册自定义过滤器
         self._register_filters()
         
@@ -69,10 +101,30 @@ class Renderer:
         
         def truncate_html(html: str, length: int = 200) -> str:
             """截断 HTML 内容（简单实现）"""
-            # 移除 HTML 标签
-            import re
-            text = re.sub(r'<[^>]+>', '', html)
-            if len(text) <= length:
+            # 逐段跳过 HTML 标签，取够 length 个字符后即停止，无需扫描整篇文章
+            parts = []
+            count = 0
+            pos = 0
+            end = len(html)
+            while pos < end and count <= length:
+                lt = html.find('<', pos)
+                gt = html.find('>', lt + 1) if lt != -1 else -1
+                if gt == -1:
+                    # 后面没有完整的标签
+                    segment = html[pos:]
+                    pos = end
+                elif gt == lt + 1:
+                    # "<>" 不是标签，保留 "<" 继续扫描
+                    segment = html[pos:gt]
+                    pos = gt
+                else:
+                    segment = html[pos:lt]
+                    pos = gt + 1
+                parts.append(segment)
+                count += len(segment)
+            
+            text = ''.join(parts)
+            if count <= length:
                 return text
             return text[:length].rsplit(' ', 1)[0] + '...'
         
@@ -85,12 +137,7 @@ class Renderer:
         site_config = self.config.get_site_config()
         self.env.globals['site'] = site_config
         
-        # 获取 base_path（用于子目录部署）
-        base_path = site_config.get('base_path', '').strip()
-        if base_path and not base_path.startswith('/'):
-            base_path = '/' + base_path
-        if base_path.endswith('/'):
-            base_path = base_path[:-1]
+        base_path = self._base_path
         
         # 完整配置（供高级使用）
         self.env.globals['config'] = self.config.data
@@ -104,13 +151,15 @@ class Renderer:
         # 当前年份（用于版权信息等）
         self.env.globals['current_year'] = datetime.now().year
         
-        # URL 生成函数
+        # URL 生成函数（只依赖参数和构建期间不变的 base_path，结果可以缓存）
+        @lru_cache(maxsize=2048)
         def url_for(path: str) -> str:
             """生成页面 URL（支持 base_path）"""
             if not path.startswith('/'):
                 path = '/' + path
             return f'{base_path}{path}'
         
+        @lru_cache(maxsize=2048)
         def url_for_static(path: str) -> str:
             """生成静态资源 URL"""
             # 确保路径以 static/ 开头
@@ -121,6 +170,64 @@ class Renderer:
         self.env.globals['url_for'] = url_for
         self.env.globals['url_for_static'] = url_for_static
     
+    def _create_bytecode_cache(self) -> Optional[FileSystemBytecodeCache]:
+        """
+        创建模板字节码缓存
+        
+        编译后的模板保存在站点目录的 .mblog_cache/jinja 下，模板未修改时
+        后续构建直接加载，无需重新解析和编译
+        
+        Returns:
+            字节码缓存，缓存目录无法创建时返回 None
+        """
+        cache_dir = self.config.config_path.resolve().parent / '.mblog_cache' / 'jinja'
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return None
+        return FileSystemBytecodeCache(str(cache_dir))
+    
+    def _template(self, name: str, fallback: Optional[str] = None) -> Template:
+        """
+        获取指定类型的模板（带缓存）
+        
+        Args:
+            name: 模板类型（如 'post'、'index'）
+            fallback: 主题未提供该模板时使用的替代模板类型
+            
+        Returns:
+            Jinja2 模板对象
+        """
+        template = self._tpl_cache.get(name)
+        if template is None:
+            if fallback is not None and not self.theme.has_template(name):
+                template_path = self.theme.get_template(fallback)
+            else:
+                template_path = self.theme.get_template(name)
+            template = self.env.get_template(Path(template_path).name)
+            self._tpl_cache[name] = template
+        return template
+    
+    def precompile(self) -> int:
+        """
+        预编译主题配置的所有模板
+        
+        模板在主进程中编译一次并写入字节码缓存，之后创建的渲染子进程
+        直接加载编译结果，无需各自解析模板
+        
+        Returns:
+            成功编译的模板数
+        """
+        count = 0
+        for name in self.theme.metadata.get('templates', {}):
+            try:
+                self._template(name)
+            except Exception:
+                # 编译失败的模板留到实际渲染时再报错
+                continue
+            count += 1
+        return count
+    
     def _derive_key(self, password: str, salt: bytes) -> bytes:
         """
         Derive a 256-bit encryption key from password using PBKDF2.
@@ -140,6 +247,32 @@ class Renderer:
         )
         return kdf.derive(password.encode('utf-8'))
     
+    def _get_cipher(self, password: str) -> Tuple[str, AESGCM]:
+        """
+        Get the salt and AES-GCM cipher for a password.
+        
+        PBKDF2 is deliberately slow, so each distinct password is derived
+        once per build with its own random salt; every post sharing the
+        password reuses that salt and cipher with a fresh nonce.
+        
+        Args:
+            password: User's password
+        
+        Returns:
+            (Base64-encoded salt, cipher) tuple
+        """
+        cached = self._key_cache.get(password)
+        if cached is None:
+            # Threads missing the cache together wait on one derivation per password;
+            # dict.setdefault is atomic, so all of them get the same lock
+            with self._key_locks.setdefault(password, threading.Lock()):
+                cached = self._key_cache.get(password)
+                if cached is None:
+                    salt = os.urandom(SALT_SIZE)
+                    cipher = AESGCM(self._derive_key(password, salt))
+                    cached = self._key_cache[password] = (_b64encode(salt), cipher)
+        return cached
+    
     def _encrypt_content(self, content: str, password: str) -> str:
         """
         Encrypt content using AES-GCM-256.
@@ -151,31 +284,16 @@ class Renderer:
         Returns:
             Encrypted data in format: "salt:nonce:ciphertext" (Base64 encoded)
         """
-        # Generate random salt and nonce
-        salt = os.urandom(SALT_SIZE)
+        # Per-password salt and key, fresh random nonce for every post
+        salt_b64, cipher = self._get_cipher(password)
         nonce = os.urandom(NONCE_SIZE)
         
-        # Derive key from password
-        key = self._derive_key(password, salt)
-        
         # Encrypt using AES-GCM
-        cipher = Cipher(
-            algorithms.AES(key),
-            modes.GCM(nonce),
-        )
-        encryptor = cipher.encryptor()
-        ciphertext = encryptor.update(content.encode('utf-8')) + encryptor.finalize()
-        
-        # GCM mode automatically includes authentication tag
-        # Tag is appended to ciphertext by the library
-        ciphertext_with_tag = ciphertext + encryptor.tag
+        # The authentication tag is appended to the ciphertext by AESGCM
+        ciphertext_with_tag = cipher.encrypt(nonce, content.encode('utf-8'), None)
         
-        # Encode components as Base64
-        salt_b64 = base64.b64encode(salt).decode('utf-8')
-        nonce_b64 = base64.b64encode(nonce).decode('utf-8')
-        ciphertext_b64 = base64.b64encode(ciphertext_with_tag).decode('utf-8')
-        
-        return f"{salt_b64}:{nonce_b64}:{ciphertext_b64}"
+        # Encode components as Base64 (salt is already encoded once per password)
+        return f"{salt_b64}:{_b64encode(nonce)}:{_b64encode(ciphertext_with_tag)}"
     
     def render_index(self, posts: List[Post], page: int = 1, 
                     posts_per_page: Optional[int] = None) -> str:
@@ -194,8 +312,7 @@ class Renderer:
             RendererError: 渲染失败
         """
         try:
-            template_path = self.theme.get_template('index')
-            template = self.env.get_template(Path(template_path).name)
+            template = self._template('index')
         except Exception as e:
             raise RendererError(f"无法加载首页模板: {e}")
         
@@ -208,14 +325,7 @@ class Renderer:
             start_idx = (page - 1) * posts_per_page
             end_idx = start_idx + posts_per_page
             posts = posts[start_idx:end_idx]
-            
-            # 获取 base_path
-            site_config = self.config.get_site_config()
-            base_path = site_config.get('base_path', '').strip()
-            if base_path and not base_path.startswith('/'):
-                base_path = '/' + base_path
-            if base_path.endswith('/'):
-                base_path = base_path[:-1]
+            base_path = self._base_path
             
             # 生成分页 URL
             prev_url = f'{base_path}/' if page == 2 else f'{base_path}/page/{page - 1}.html' if page > 1 else None
@@ -264,20 +374,14 @@ class Renderer:
                     encrypted_html = self._encrypt_content(post.html, post.password)
                     
                     # 使用加密模板渲染，传递加密后的内容
-                    template_path = self.theme.get_template('encrypted_post')
-                    template = self.env.get_template(Path(template_path).name)
-                    
-                    # 创建一个包含加密内容的上下文
-                    context = {
-                        'post': post,
-                        'encrypted_html': encrypted_html
-                    }
+                    template = self._template('encrypted_post')
                     
-                    # 临时替换 post.html 为加密内容
-                    original_html = post.html
-                    post.html = encrypted_html
-                    html = template.render(post=post)
-                    post.html = original_html  # 恢复原始内容
+                    # 加密内容通过 encrypted_html 传递；为兼容仍读取 post.html 的主题，
+                    # 同时传入 html 替换为密文的文章副本（不修改原对象，可并发渲染）
+                    html = template.render(
+                        post=replace(post, html=encrypted_html),
+                        encrypted_html=encrypted_html
+                    )
                     
                     return html
                 except Exception as e:
@@ -285,14 +389,12 @@ class Renderer:
             else:
                 # 主题不支持加密 - 显示提示信息
                 try:
-                    template_path = self.theme.get_template('post')
-                    template = self.env.get_template(Path(template_path).name)
+                    template = self._template('post')
                     
-                    # 临时替换内容为提示信息
-                    original_html = post.html
-                    post.html = '<div class="encrypted-notice"><p>⚠️ 当前主题不支持加密文章功能</p><p>请更换支持加密的主题或联系主题开发者添加加密模板支持。</p></div>'
-                    html = template.render(post=post)
-                    post.html = original_html  # 恢复原始内容
+                    # 使用内容替换为提示信息的文章副本渲染
+                    # 与 Post.html 一样标记为安全 HTML，模板中不加 | safe 也能正常输出
+                    notice = Markup('<div class="encrypted-notice"><p>⚠️ 当前主题不支持加密文章功能</p><p>请更换支持加密的主题或联系主题开发者添加加密模板支持。</p></div>')
+                    html = template.render(post=replace(post, html=notice))
                     
                     return html
                 except Exception as e:
@@ -300,13 +402,37 @@ class Renderer:
         
         # 普通文章 - 正常渲染
         try:
-            template_path = self.theme.get_template('post')
-            template = self.env.get_template(Path(template_path).name)
+            template = self._template('post')
             html = template.render(post=post)
             return html
         except Exception as e:
             raise RendererError(f"渲染文章页失败: {e}")
-
+    
+    def render_post_to(self, post: Post, fp: TextIO) -> None:
+        """
+        渲染文章详情页并直接写入文件对象
+        
+        普通文章按模板片段逐段写入，无需先拼接出完整的 HTML 字符串；
+        加密文章需要对完整内容加密，仍先渲染为字符串再写入。
+        渲染过程不修改文章对象和模板环境，可以在多个线程中同时调用
+        
+        Args:
+            post: 文章对象
+            fp: 已打开的文本文件对象
+            
+        Raises:
+            RendererError: 渲染失败
+        """
+        if post.encrypted and post.password:
+            fp.write(self.render_post(post))
+            return
+        
+        try:
+            template = self._template('post')
+            template.stream(post=post).dump(fp)
+        except Exception as e:
+            raise RendererError(f"渲染文章页失败: {e}")
+    
     def render_archive(self, posts: List[Post]) -> str:
         """
         渲染归档页
@@ -324,11 +450,7 @@ class Renderer:
         """
         # 尝试使用归档模板，如果不存在则使用首页模板
         try:
-            if self.theme.has_template('archive'):
-                template_path = self.theme.get_template('archive')
-            else:
-                template_path = self.theme.get_template('index')
-            template = self.env.get_template(Path(template_path).name)
+            template = self._template('archive', fallback='index')
         except Exception as e:
             raise RendererError(f"无法加载归档模板: {e}")
         
@@ -363,11 +485,7 @@ class Renderer:
         """
         # 尝试使用标签模板，如果不存在则使用首页模板
         try:
-            if self.theme.has_template('tag'):
-                template_path = self.theme.get_template('tag')
-            else:
-                template_path = self.theme.get_template('index')
-            template = self.env.get_template(Path(template_path).name)
+            template = self._template('tag', fallback='index')
         except Exception as e:
             raise RendererError(f"无法加载标签模板: {e}")
         
@@ -398,11 +516,7 @@ class Renderer:
         """
         # 尝试使用标签索引模板，如果不存在则使用首页模板
         try:
-            if self.theme.has_template('tags'):
-                template_path = self.theme.get_template('tags')
-            else:
-                template_path = self.theme.get_template('index')
-            template = self.env.get_template(Path(template_path).name)
+            template = self._template('tags', fallback='index')
         except Exception as e:
             raise RendererError(f"无法加载标签索引模板: {e}")
         
@@ -435,21 +549,13 @@ class Renderer:
         Returns:
             嵌套字典: {year: {month: [posts]}}
         """
-        archive: Dict[int, Dict[int, List[Post]]] = {}
+        archive: Dict[int, Dict[int, List[Post]]] = defaultdict(lambda: defaultdict(list))
         
         for post in posts:
-            year = post.date.year
-            month = post.date.month
-            
-            if year not in archive:
-                archive[year] = {}
-            
-            if month not in archive[year]:
-                archive[year][month] = []
-            
-            archive[year][month].append(post)
+            archive[post.year][post.month].append(post)
         
-        return archive
+        # 转回普通字典，避免模板中访问不存在的键时意外插入空项
+        return {year: dict(months) for year, months in archive.items()}
     
     def get_all_tags(self, posts: List[Post]) -> Dict[str, List[Post]]:
         """
@@ -461,12 +567,10 @@ class Renderer:
         Returns:
             标签到文章列表的映射
         """
-        tags_map: Dict[str, List[Post]] = {}
+        tags_map: Dict[str, List[Post]] = defaultdict(list)
         
         for post in posts:
             for tag in post.tags:
-                if tag not in tags_map:
-                    tags_map[tag] = []
                 tags_map[tag].append(post)
         
-        return tags_map
+        return dict(tags_map)
@@ -3,9 +3,29 @@
 负责加载、验证和管理博客主题
 """
 import json
+import os
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from .config import _load_json
+
+
+def _scan_dir(path: Path) -> Dict[str, os.DirEntry]:
+    """
+    读取目录内容
+    
+    Args:
+        path: 目录路径
+        
+    Returns:
+        文件名到目录项的映射，目录不存在或无法读取时返回空字典
+    """
+    try:
+        with os.scandir(path) as it:
+            return {entry.name: entry for entry in it}
+    except OSError:
+        return {}
+
 
 class ThemeError(Exception):
     """主题错误"""
@@ -25,6 +45,9 @@ class Theme:
         self.theme_dir = Path(theme_dir)
         self._metadata: Dict[str, Any] = {}
         self._loaded = False
+        
+        # 模板路径缓存: 模板名称 -> 模板文件路径（主题在运行期间不会变化）
+        self._template_paths: Dict[str, str] = {}
     
     def load(self) -> bool:
         """
@@ -42,12 +65,13 @@ class Theme:
         if not self.theme_dir.is_dir():
             raise ThemeError(f"主题路径不是目录: {self.theme_dir}")
         
+        self._template_paths = {}
+        
         # 加载主题元数据
         theme_json_path = self.theme_dir / 'theme.json'
         if theme_json_path.exists():
             try:
-                with open(theme_json_path, 'r', encoding='utf-8') as f:
-                    self._metadata = json.load(f)
+                self._metadata = _load_json(theme_json_path)
             except json.JSONDecodeError as e:
                 raise ThemeError(f"主题元数据文件格式错误: {e}")
             except Exception as e:
@@ -77,21 +101,26 @@ class Theme:
         Raises:
             ThemeError: 主题结构不符合规范
         """
+        # 一次读取主题目录和模板目录的内容，代替逐个路径 stat
+        entries = _scan_dir(self.theme_dir)
+        
         # 检查必需的目录
         templates_dir = self.theme_dir / 'templates'
-        if not templates_dir.exists() or not templates_dir.is_dir():
+        templates_entry = entries.get('templates')
+        if templates_entry is None or not templates_entry.is_dir():
             raise ThemeError(f"主题缺少 templates 目录: {templates_dir}")
         
         # 检查必需的模板文件
+        template_files = _scan_dir(templates_dir)
         required_templates = ['base.html', 'index.html', 'post.html']
         for template_name in required_templates:
-            template_path = templates_dir / template_name
-            if not template_path.exists():
+            if template_name not in template_files:
                 raise ThemeError(f"主题缺少必需的模板文件: {template_name}")
         
         # static 目录是可选的，但如果存在应该是目录
         static_dir = self.theme_dir / 'static'
-        if static_dir.exists() and not static_dir.is_dir():
+        static_entry = entries.get('static')
+        if static_entry is not None and not static_entry.is_dir():
             raise ThemeError(f"static 路径存在但不是目录: {static_dir}")
         
         return True
@@ -128,6 +157,10 @@ class Theme:
         if not self._loaded:
             raise ThemeError("主题尚未加载，请先调用 load() 方法")
         
+        cached = self._template_paths.get(template_name)
+        if cached is not None:
+            return cached
+        
         # 检查元数据中是否有模板映射
         templates_config = self._metadata.get('templates', {})
         
@@ -146,7 +179,8 @@ class Theme:
         if not template_path.exists():
             raise ThemeError(f"模板文件不存在: {actual_filename}")
         
-        return str(template_path)
+        self._template_paths[template_name] = str(template_path)
+        return self._template_paths[template_name]
     
     def get_static_dir(self) -> str:
         """
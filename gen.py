@@ -36,13 +36,16 @@ def main():
         # 处理 Markdown 文件
         print("→ 处理 Markdown 文章...")
         base_path = config.get("site", {}).get("base_path", "")
-        processor = MarkdownProcessor("md", base_path=base_path)
+        workers = config.get("build", {}).get("workers")
+        engine = config.get("build", {}).get("markdown_engine", "markdown")
+        processor = MarkdownProcessor("md", base_path=base_path, workers=workers, engine=engine)
         posts = processor.load_posts()
         print(f"  找到 {len(posts)} 篇文章")
         
         # 初始化渲染器
         print("→ 初始化渲染器...")
         renderer = Renderer(theme, config)
+        renderer.precompile()
         
         # 生成静态文件
         print("→ 生成静态文件...")
@@ -4,7 +4,7 @@
  */
 
 // Encryption constants - must match Python constants
-const PBKDF2_ITERATIONS = 100000;
+const PBKDF2_ITERATIONS = 600000;
 const KEY_SIZE = 256;  // bits
 const SALT_SIZE = 16;  // bytes
 const NONCE_SIZE = 12;  // bytes